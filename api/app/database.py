@@ -1,24 +1,59 @@
 """Database abstraction layer - supports both SQLite and PostgreSQL."""
 
 import os
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, inspect
 from sqlalchemy.orm import sessionmaker, DeclarativeBase
+from sqlalchemy.pool import StaticPool
 
 # Get database URL from environment, default to SQLite
 DATABASE_URL = os.getenv("DATABASE_URL", "sqlite:///./movies.db")
 
-# SQLite-specific configuration for better concurrency
-connect_args = {}
+# Connection pool limits; the request threadpool is sized to match (main.py)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "20"))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", "10"))
+
+# Dialect-specific connection and pool configuration
+engine_args = {}
 if DATABASE_URL.startswith("sqlite"):
-    connect_args = {"check_same_thread": False}
+    # SQLite-specific configuration for better concurrency
+    engine_args["connect_args"] = {"check_same_thread": False}
+    if ":memory:" in DATABASE_URL or DATABASE_URL in ("sqlite://", "sqlite:///"):
+        # An in-memory database lives in a single connection; share it
+        engine_args["poolclass"] = StaticPool
+    else:
+        engine_args.update(pool_size=DB_POOL_SIZE, max_overflow=DB_MAX_OVERFLOW)
+else:
+    # Size the pool for the worker threadpool so requests do not stall on
+    # "QueuePool limit reached"; pre-ping and recycle drop dead connections
+    # after a server restart or idle timeout.
+    engine_args.update(
+        pool_size=DB_POOL_SIZE,
+        max_overflow=DB_MAX_OVERFLOW,
+        pool_timeout=int(os.getenv("DB_POOL_TIMEOUT", "30")),
+        pool_recycle=int(os.getenv("DB_POOL_RECYCLE", "1800")),
+        pool_pre_ping=True,
+    )
 
 # Create engine with dialect-agnostic settings
 engine = create_engine(
     DATABASE_URL,
-    connect_args=connect_args,
     echo=False,  # Set to True for SQL query logging
+    **engine_args,
 )
 
+if DATABASE_URL.startswith("sqlite"):
+    @event.listens_for(engine, "connect")
+    def _sqlite_pragmas(dbapi_connection, _connection_record):
+        """Tune each SQLite connection: WAL lets readers run alongside a writer,
+        and synchronous=NORMAL commits with a WAL append instead of a full fsync."""
+        cursor = dbapi_connection.cursor()
+        cursor.execute("PRAGMA journal_mode=WAL")
+        cursor.execute("PRAGMA synchronous=NORMAL")
+        cursor.execute("PRAGMA temp_store=MEMORY")
+        cursor.execute("PRAGMA mmap_size=268435456")  # 256 MiB
+        cursor.execute("PRAGMA cache_size=-64000")  # ~64 MB
+        cursor.close()
+
 # Session factory
 SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
 
@@ -40,3 +75,11 @@ def get_db():
 def init_db():
     """Initialize database - create all tables."""
     Base.metadata.create_all(bind=engine)
+
+
+def has_unique_key(bind, table_name: str, columns) -> bool:
+    """Check whether the live table has a unique constraint or index on exactly these columns."""
+    inspector = inspect(bind)
+    keys = [uc["column_names"] for uc in inspector.get_unique_constraints(table_name)]
+    keys += [ix["column_names"] for ix in inspector.get_indexes(table_name) if ix["unique"]]
+    return any(set(key) == set(columns) for key in keys)
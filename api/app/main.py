@@ -1,22 +1,61 @@
 """FastAPI application - main entry point."""
 
-from fastapi import FastAPI, Depends, Query, HTTPException, status
+import os
+import time
+
+from anyio import to_thread
+import orjson
+from fastapi import FastAPI, Depends, Query, HTTPException, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
-from sqlalchemy import or_, func
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy.orm import Session, selectinload, joinedload
+from sqlalchemy import or_, func, insert, select, tuple_, union
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
 from typing import Optional
 
-from .database import get_db, init_db
-from .models import Movie, Genre, Actor, Director
-from .schemas import MovieCreate, MovieResponse, MoviesListResponse
+from .database import DB_MAX_OVERFLOW, DB_POOL_SIZE, get_db, has_unique_key, init_db
+from .models import Movie, Genre, Actor, Director, movie_actor, movie_genre
+from .schemas import MovieCreate, MovieResponse, MoviesListResponse, PersonBase
 
 # Initialize FastAPI app
 app = FastAPI(
     title="Nettileffa API",
     description="Movie service backend with SQLite/PostgreSQL support",
     version="1.0.0",
+    default_response_class=ORJSONResponse,
+)
+
+# Eager loading for movie responses: collections via a flat "WHERE id IN (...)"
+# query each, the many-to-one director via a join (no row multiplication).
+MOVIE_LOAD_OPTIONS = (
+    selectinload(Movie.genres),
+    selectinload(Movie.actors),
+    joinedload(Movie.director),
 )
 
+# Sortable columns for /api/movies, resolved once at import
+_SORT_COLS = {
+    "year": Movie.year,
+    "rating": Movie.rating,
+    "name": Movie.name,
+}
+
+# Sync route handlers run in AnyIO's worker threadpool, which caps concurrent
+# in-flight requests. Each request holds one pooled connection, so by default
+# match the pool's capacity: extra threads would only wait on connections.
+THREADPOOL_SIZE = int(os.getenv("API_THREADPOOL_SIZE", str(DB_POOL_SIZE + DB_MAX_OVERFLOW)))
+
+# Unfiltered movie total, cached in-process so paging does not run COUNT(*)
+# on every request. Invalidated by writes; the TTL bounds staleness from
+# other workers or the seed script.
+COUNT_CACHE_TTL = 30.0
+_count_cache = {"value": None, "ts": 0.0}
+
+# Sorted genre names; genres change only when movies are written
+GENRES_CACHE_TTL = 60.0
+_genres_cache = {"value": None, "ts": 0.0}
+
 # CORS middleware - allow frontend dev server
 app.add_middleware(
     CORSMiddleware,
@@ -24,13 +63,18 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    # NDJSON responses carry the total and next cursor in headers
+    expose_headers=["X-Total-Count", "X-Next-After-Sort", "X-Next-After-Id"],
 )
 
 
 @app.on_event("startup")
 def startup_event():
-    """Initialize database on startup."""
-    init_db()
+    """Size the request threadpool; optionally create tables for local development."""
+    to_thread.current_default_thread_limiter().total_tokens = THREADPOOL_SIZE
+    # Schema is created at deploy time (python -m app.seed), not on every worker boot
+    if os.getenv("AUTO_CREATE_TABLES") == "1":
+        init_db()
 
 
 @app.get("/")
@@ -39,13 +83,168 @@ def root():
     return {"status": "ok", "service": "nettileffa-api"}
 
 
+def invalidate_caches():
+    """Drop cached aggregates after a write that may change them."""
+    _count_cache["value"] = None
+    _genres_cache["value"] = None
+
+
+def _cached_total(db: Session) -> int:
+    """Return the total number of movies, served from cache while fresh."""
+    now = time.monotonic()
+    if _count_cache["value"] is None or now - _count_cache["ts"] >= COUNT_CACHE_TTL:
+        _count_cache["value"] = db.query(func.count(Movie.id)).scalar()
+        _count_cache["ts"] = now
+    return _count_cache["value"]
+
+
+def _movie_to_dict(movie: Movie) -> dict:
+    """
+    Serialize a Movie in the MovieResponse shape without pydantic validation.
+
+    The single serializer for movie responses: routes return it in an
+    ORJSONResponse, since rows come from typed columns (response_model still
+    documents the shape).
+    """
+    director = movie.director
+    return {
+        "id": movie.id,
+        "name": movie.name,
+        "year": movie.year,
+        "age_limit": movie.age_limit,
+        "rating": movie.rating,
+        "synopsis": movie.synopsis,
+        "genres": [genre.name for genre in movie.genres],
+        "actors": [
+            {"firstName": actor.first_name, "lastName": actor.last_name}
+            for actor in movie.actors
+        ],
+        "director": {
+            "firstName": director.first_name,
+            "lastName": director.last_name,
+        } if director else None,
+    }
+
+
+# Conflict targets confirmed to have a unique index, per engine. Databases created
+# before uq_actor_name / uq_director_name lack them until `python -m app.upgrade`
+# runs; only positive results are remembered, so the upgrade is picked up live.
+_conflict_targets = set()
+
+
+def _has_conflict_target(db: Session, model, index_elements: list[str]) -> bool:
+    """Whether ON CONFLICT (index_elements) is valid for the model's table."""
+    key = (db.get_bind().engine, model.__tablename__, tuple(index_elements))
+    # Inspect on the session's own connection; checking out another one from
+    # the pool could wait on connections held by concurrent requests
+    if key not in _conflict_targets and has_unique_key(db.connection(), model.__tablename__, index_elements):
+        _conflict_targets.add(key)
+    return key in _conflict_targets
+
+
+def _insert_ignoring_conflicts(db: Session, model, rows: list[dict], index_elements: list[str]):
+    """
+    Bulk insert rows, skipping those that collide with a unique index.
+
+    Falls back to a plain insert when the table has no unique index on
+    index_elements (a database not yet upgraded); rows were already checked
+    to be missing, so only a concurrent insert of the same row can slip through.
+    """
+    dialect = db.get_bind().dialect.name
+    if dialect not in ("postgresql", "sqlite") or not _has_conflict_target(db, model, index_elements):
+        stmt = insert(model)
+    elif dialect == "postgresql":
+        stmt = pg_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    else:
+        stmt = sqlite_insert(model).on_conflict_do_nothing(index_elements=index_elements)
+    db.execute(stmt, rows)
+
+
+def request_cache() -> dict:
+    """
+    Per-request identity cache for genres, actors and directors.
+
+    Keyed by (type, natural key); the helpers below consult it before querying,
+    so entities resolved once in a request are not looked up again.
+    """
+    return {}
+
+
+def _get_or_create_genres(db: Session, names: list[str], cache: Optional[dict] = None) -> list[Genre]:
+    """Resolve genre names to Genre rows with a single IN query, adding missing ones."""
+    cache = {} if cache is None else cache
+    names = list(dict.fromkeys(names))
+    missing = [name for name in names if ("genre", name) not in cache]
+    if missing:
+        for genre in db.query(Genre).filter(Genre.name.in_(missing)).all():
+            cache[("genre", genre.name)] = genre
+        new_names = [name for name in missing if ("genre", name) not in cache]
+        if new_names:
+            # Concurrent requests may insert the same genre; let the unique
+            # index absorb the race, then read back every id in one query
+            _insert_ignoring_conflicts(db, Genre, [{"name": name} for name in new_names], ["name"])
+            for genre in db.query(Genre).filter(Genre.name.in_(new_names)).all():
+                cache[("genre", genre.name)] = genre
+    return [cache[("genre", name)] for name in names]
+
+
+def _get_or_create_actors(db: Session, people: list[PersonBase], cache: Optional[dict] = None) -> list[Actor]:
+    """Resolve actors by (first_name, last_name) with a single IN query, adding missing ones."""
+    cache = {} if cache is None else cache
+    keys = list(dict.fromkeys((person.first_name, person.last_name) for person in people))
+    missing = [key for key in keys if ("actor", key) not in cache]
+    if missing:
+        for actor in db.query(Actor).filter(tuple_(Actor.first_name, Actor.last_name).in_(missing)).all():
+            cache[("actor", (actor.first_name, actor.last_name))] = actor
+        new_keys = [key for key in missing if ("actor", key) not in cache]
+        if new_keys:
+            _insert_ignoring_conflicts(
+                db,
+                Actor,
+                [{"first_name": first_name, "last_name": last_name} for first_name, last_name in new_keys],
+                ["first_name", "last_name"],
+            )
+            for actor in db.query(Actor).filter(tuple_(Actor.first_name, Actor.last_name).in_(new_keys)).all():
+                cache[("actor", (actor.first_name, actor.last_name))] = actor
+    return [cache[("actor", key)] for key in keys]
+
+
+def _get_or_create_director(
+    db: Session, person: Optional[PersonBase], cache: Optional[dict] = None
+) -> Optional[Director]:
+    """Resolve a director by name, adding it if missing."""
+    if person is None:
+        return None
+    cache = {} if cache is None else cache
+    key = ("director", (person.first_name, person.last_name))
+    if key not in cache:
+        query = db.query(Director).filter(
+            Director.first_name == person.first_name,
+            Director.last_name == person.last_name,
+        )
+        director = query.first()
+        if not director:
+            _insert_ignoring_conflicts(
+                db,
+                Director,
+                [{"first_name": person.first_name, "last_name": person.last_name}],
+                ["first_name", "last_name"],
+            )
+            director = query.first()
+        cache[key] = director
+    return cache[key]
+
+
 @app.get("/api/movies", response_model=MoviesListResponse)
 def get_movies(
+    request: Request,
     search: Optional[str] = None,
-    sort: str = Query("year", regex="^(year|rating|name)$"),
-    order: str = Query("desc", regex="^(asc|desc)$"),
+    sort: str = Query("year", pattern="^(year|rating|name)$"),
+    order: str = Query("desc", pattern="^(asc|desc)$"),
     limit: int = Query(20, ge=1, le=100),
     offset: int = Query(0, ge=0),
+    after_sort: Optional[str] = None,
+    after_id: Optional[int] = None,
     db: Session = Depends(get_db),
 ):
     """
@@ -55,47 +254,87 @@ def get_movies(
     - **sort**: Sort by year, rating, or name (default: year)
     - **order**: Sort order asc or desc (default: desc)
     - **limit**: Number of results per page (default: 20, max: 100)
-    - **offset**: Number of results to skip (default: 0)
+    - **offset**: Number of results to skip (default: 0, deprecated in favour of the cursor)
+    - **after_sort**, **after_id**: Cursor from the previous page's `next_cursor`;
+      returns the rows after it and ignores `offset`
+
+    Clients sending `Accept: application/x-ndjson` get one movie per line
+    instead, with the total and next cursor in `X-Total-Count` and
+    `X-Next-After-Sort` / `X-Next-After-Id` headers.
     """
-    query = db.query(Movie)
+    if (after_sort is None) != (after_id is None):
+        raise HTTPException(status_code=422, detail="after_sort and after_id must be given together")
+
+    query = db.query(Movie).options(*MOVIE_LOAD_OPTIONS)
 
-    # Apply search filter
+    # Apply search filter as "id IN (UNION of per-table matches)" rather than an
+    # OR across outer joins: each branch filters one relation, so PostgreSQL can
+    # serve the movies branch from the pg_trgm GIN indexes on name and synopsis,
+    # and no DISTINCT is needed. Keep ILIKE (not lower() LIKE) for those indexes.
     if search:
         search_term = f"%{search}%"
-        query = query.outerjoin(Movie.genres).outerjoin(Movie.actors).outerjoin(Movie.director).filter(
-            or_(
-                Movie.name.ilike(search_term),
-                Movie.synopsis.ilike(search_term),
-                Genre.name.ilike(search_term),
-                Actor.first_name.ilike(search_term),
-                Actor.last_name.ilike(search_term),
-                Director.first_name.ilike(search_term),
-                Director.last_name.ilike(search_term),
-            )
-        ).distinct()
+        matching_ids = union(
+            select(Movie.id).where(or_(Movie.name.ilike(search_term), Movie.synopsis.ilike(search_term))),
+            select(movie_genre.c.movie_id)
+            .join(Genre, Genre.id == movie_genre.c.genre_id)
+            .where(Genre.name.ilike(search_term)),
+            select(movie_actor.c.movie_id)
+            .join(Actor, Actor.id == movie_actor.c.actor_id)
+            .where(or_(Actor.first_name.ilike(search_term), Actor.last_name.ilike(search_term))),
+            select(Movie.id)
+            .join(Director, Director.id == Movie.director_id)
+            .where(or_(Director.first_name.ilike(search_term), Director.last_name.ilike(search_term))),
+        )
+        query = query.filter(Movie.id.in_(matching_ids))
 
     # Get total count before pagination
-    total = query.count()
+    total = query.count() if search else _cached_total(db)
 
     # Apply sorting
-    sort_column = {
-        "year": Movie.year,
-        "rating": Movie.rating,
-        "name": Movie.name,
-    }[sort]
+    sort_column = _SORT_COLS[sort]
 
+    # Movie.id breaks ties so the order is total and the cursor is unambiguous
     if order == "desc":
-        query = query.order_by(sort_column.desc())
+        query = query.order_by(sort_column.desc(), Movie.id.desc())
     else:
-        query = query.order_by(sort_column.asc())
-
-    # Apply pagination
-    movies = query.offset(offset).limit(limit).all()
-
-    # Convert to response schema
-    items = [MovieResponse.from_orm_movie(movie) for movie in movies]
+        query = query.order_by(sort_column.asc(), Movie.id.asc())
+
+    # Apply pagination: seek past the cursor when given, otherwise skip rows
+    if after_id is not None:
+        if sort != "name":
+            try:
+                after_sort = int(after_sort)
+            except ValueError:
+                raise HTTPException(status_code=422, detail=f"after_sort must be an integer when sorting by {sort}")
+        key = tuple_(sort_column, Movie.id)
+        cursor = tuple_(after_sort, after_id)
+        query = query.filter(key < cursor if order == "desc" else key > cursor)
+    else:
+        query = query.offset(offset)
+    movies = query.limit(limit).all()
+
+    next_cursor = None
+    if len(movies) == limit:
+        last = movies[-1]
+        next_cursor = {"after_sort": str(getattr(last, sort)), "after_id": last.id}
+
+    if "application/x-ndjson" in request.headers.get("accept", ""):
+        headers = {"X-Total-Count": str(total)}
+        if next_cursor:
+            headers["X-Next-After-Sort"] = next_cursor["after_sort"]
+            headers["X-Next-After-Id"] = str(next_cursor["after_id"])
+        items = [_movie_to_dict(movie) for movie in movies]
+        return StreamingResponse(
+            (orjson.dumps(item) + b"\n" for item in items),
+            media_type="application/x-ndjson",
+            headers=headers,
+        )
 
-    return MoviesListResponse(total=total, items=items)
+    return ORJSONResponse({
+        "total": total,
+        "items": [_movie_to_dict(movie) for movie in movies],
+        "next_cursor": next_cursor,
+    })
 
 
 @app.post("/api/movies", response_model=MovieResponse, status_code=status.HTTP_201_CREATED)
@@ -112,43 +351,9 @@ def create_movie(movie_data: MovieCreate, db: Session = Depends(get_db)):
     - **actors**: List of actors (optional)
     - **director**: Movie director (optional)
     """
-    # Create or get genres
-    genre_objects = []
-    for genre_name in movie_data.genres:
-        genre = db.query(Genre).filter(Genre.name == genre_name).first()
-        if not genre:
-            genre = Genre(name=genre_name)
-            db.add(genre)
-        genre_objects.append(genre)
-
-    # Create or get director
-    director_obj = None
-    if movie_data.director:
-        director_obj = db.query(Director).filter(
-            Director.first_name == movie_data.director.first_name,
-            Director.last_name == movie_data.director.last_name,
-        ).first()
-        if not director_obj:
-            director_obj = Director(
-                first_name=movie_data.director.first_name,
-                last_name=movie_data.director.last_name,
-            )
-            db.add(director_obj)
-
-    # Create or get actors
-    actor_objects = []
-    for actor_data in movie_data.actors:
-        actor = db.query(Actor).filter(
-            Actor.first_name == actor_data.first_name,
-            Actor.last_name == actor_data.last_name,
-        ).first()
-        if not actor:
-            actor = Actor(
-                first_name=actor_data.first_name,
-                last_name=actor_data.last_name,
-            )
-            db.add(actor)
-        actor_objects.append(actor)
+    genre_objects = _get_or_create_genres(db, movie_data.genres)
+    director_obj = _get_or_create_director(db, movie_data.director)
+    actor_objects = _get_or_create_actors(db, movie_data.actors)
 
     # Create movie
     movie = Movie(
@@ -164,22 +369,28 @@ def create_movie(movie_data: MovieCreate, db: Session = Depends(get_db)):
 
     db.add(movie)
     db.commit()
+    invalidate_caches()
     db.refresh(movie)
 
-    return MovieResponse.from_orm_movie(movie)
+    return ORJSONResponse(_movie_to_dict(movie), status_code=status.HTTP_201_CREATED)
 
 
 @app.get("/api/movies/{movie_id}", response_model=MovieResponse)
 def get_movie(movie_id: int, db: Session = Depends(get_db)):
     """Get a single movie by ID."""
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
+    movie = db.query(Movie).options(*MOVIE_LOAD_OPTIONS).filter(Movie.id == movie_id).first()
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
-    return MovieResponse.from_orm_movie(movie)
+    return ORJSONResponse(_movie_to_dict(movie))
 
 
 @app.put("/api/movies/{movie_id}", response_model=MovieResponse)
-def update_movie(movie_id: int, movie_data: MovieCreate, db: Session = Depends(get_db)):
+def update_movie(
+    movie_id: int,
+    movie_data: MovieCreate,
+    db: Session = Depends(get_db),
+    cache: dict = Depends(request_cache),
+):
     """
     Update an existing movie.
 
@@ -187,7 +398,7 @@ def update_movie(movie_id: int, movie_data: MovieCreate, db: Session = Depends(g
     - All other fields same as create
     """
     # Find existing movie
-    movie = db.query(Movie).filter(Movie.id == movie_id).first()
+    movie = db.query(Movie).options(*MOVIE_LOAD_OPTIONS).filter(Movie.id == movie_id).first()
     if not movie:
         raise HTTPException(status_code=404, detail="Movie not found")
 
@@ -198,59 +409,32 @@ def update_movie(movie_id: int, movie_data: MovieCreate, db: Session = Depends(g
     movie.rating = movie_data.rating
     movie.synopsis = movie_data.synopsis
 
-    # Update genres
-    genre_objects = []
-    for genre_name in movie_data.genres:
-        genre = db.query(Genre).filter(Genre.name == genre_name).first()
-        if not genre:
-            genre = Genre(name=genre_name)
-            db.add(genre)
-        genre_objects.append(genre)
-    movie.genres = genre_objects
-
-    # Update director
-    if movie_data.director:
-        director_obj = db.query(Director).filter(
-            Director.first_name == movie_data.director.first_name,
-            Director.last_name == movie_data.director.last_name,
-        ).first()
-        if not director_obj:
-            director_obj = Director(
-                first_name=movie_data.director.first_name,
-                last_name=movie_data.director.last_name,
-            )
-            db.add(director_obj)
-        movie.director = director_obj
-    else:
-        movie.director = None
-
-    # Update actors
-    actor_objects = []
-    for actor_data in movie_data.actors:
-        actor = db.query(Actor).filter(
-            Actor.first_name == actor_data.first_name,
-            Actor.last_name == actor_data.last_name,
-        ).first()
-        if not actor:
-            actor = Actor(
-                first_name=actor_data.first_name,
-                last_name=actor_data.last_name,
-            )
-            db.add(actor)
-        actor_objects.append(actor)
-    movie.actors = actor_objects
+    # Entities already linked to the movie are loaded; reuse them without a query
+    cache.update({("genre", genre.name): genre for genre in movie.genres})
+    cache.update({("actor", (actor.first_name, actor.last_name)): actor for actor in movie.actors})
+    if movie.director:
+        cache[("director", (movie.director.first_name, movie.director.last_name))] = movie.director
+
+    # Update relationships
+    movie.genres = _get_or_create_genres(db, movie_data.genres, cache)
+    movie.director = _get_or_create_director(db, movie_data.director, cache)
+    movie.actors = _get_or_create_actors(db, movie_data.actors, cache)
 
     db.commit()
+    invalidate_caches()
     db.refresh(movie)
 
-    return MovieResponse.from_orm_movie(movie)
+    return ORJSONResponse(_movie_to_dict(movie))
 
 
 @app.get("/api/genres", response_model=list[str])
 def get_genres(db: Session = Depends(get_db)):
     """Get all unique genre names."""
-    genres = db.query(Genre.name).order_by(Genre.name).all()
-    return [genre[0] for genre in genres]
+    now = time.monotonic()
+    if _genres_cache["value"] is None or now - _genres_cache["ts"] >= GENRES_CACHE_TTL:
+        _genres_cache["value"] = db.execute(select(Genre.name).order_by(Genre.name)).scalars().all()
+        _genres_cache["ts"] = now
+    return _genres_cache["value"]
 
 
 @app.get("/api/actors")
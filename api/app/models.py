@@ -1,9 +1,17 @@
 """SQLAlchemy models for movies, genres, actors, and directors."""
 
-from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey
+from sqlalchemy import Column, Integer, String, Text, Table, ForeignKey, Index, UniqueConstraint, DDL, event
 from sqlalchemy.orm import relationship
 from .database import Base
 
+# pg_trgm provides the GIN operator class used by the movie search indexes below.
+# Emitted only on PostgreSQL; SQLite creates the schema without it.
+event.listen(
+    Base.metadata,
+    "before_create",
+    DDL("CREATE EXTENSION IF NOT EXISTS pg_trgm").execute_if(dialect="postgresql"),
+)
+
 # Association table for many-to-many relationship between movies and genres
 movie_genre = Table(
     "movie_genre",
@@ -27,30 +35,54 @@ class Movie(Base):
     __tablename__ = "movies"
 
     id = Column(Integer, primary_key=True, index=True)
-    name = Column(String(255), nullable=False, index=True)
-    year = Column(Integer, nullable=False, index=True)
+    name = Column(String(255), nullable=False)
+    year = Column(Integer, nullable=False)
     age_limit = Column(Integer, nullable=False)
-    rating = Column(Integer, nullable=False, index=True)
+    rating = Column(Integer, nullable=False)
     synopsis = Column(Text, nullable=True)
     director_id = Column(Integer, ForeignKey("directors.id"), nullable=True)
 
+    __table_args__ = (
+        # Listing indexes matching ORDER BY <column>, id (and the keyset cursor
+        # filter), so a page is an index range scan without a sort step. They
+        # replace the former single-column indexes on name, year and rating.
+        Index("ix_movies_year_id", year.desc(), id.desc()),
+        Index("ix_movies_rating_id", rating.desc(), id.desc()),
+        Index("ix_movies_name_id", name, id),
+        # Trigram indexes let PostgreSQL serve the ILIKE '%term%' search without
+        # a sequential scan. B-tree indexes cannot match leading wildcards.
+        Index(
+            "movies_name_trgm",
+            "name",
+            postgresql_using="gin",
+            postgresql_ops={"name": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+        Index(
+            "movies_synopsis_trgm",
+            "synopsis",
+            postgresql_using="gin",
+            postgresql_ops={"synopsis": "gin_trgm_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
+    # Relationships load lazily by default; routes choose eager loading
+    # strategies per query (see MOVIE_LOAD_OPTIONS in main.py).
+
     # Many-to-many relationship with Genre
     genres = relationship(
         "Genre",
         secondary=movie_genre,
         back_populates="movies",
-        lazy="joined",  # Eager load genres to avoid N+1 queries
     )
 
     # Many-to-one relationship with Director
-    director = relationship("Director", back_populates="movies", lazy="joined")
+    director = relationship("Director", back_populates="movies")
 
     # Many-to-many relationship with Actor
     actors = relationship(
         "Actor",
         secondary=movie_actor,
         back_populates="movies",
-        lazy="joined",  # Eager load actors to avoid N+1 queries
     )
 
     def __repr__(self):
@@ -65,6 +97,17 @@ class Genre(Base):
     id = Column(Integer, primary_key=True, index=True)
     name = Column(String(50), unique=True, nullable=False, index=True)
 
+    __table_args__ = (
+        # Pattern-ops index so lookups and LIKE 'prefix%' use an index on
+        # PostgreSQL regardless of the database collation.
+        Index(
+            "genres_name_pattern_idx",
+            "name",
+            unique=True,
+            postgresql_ops={"name": "text_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Many-to-many relationship with Movie
     movies = relationship(
         "Movie",
@@ -85,6 +128,17 @@ class Director(Base):
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
 
+    __table_args__ = (
+        # One row per person; also the conflict target for upserts
+        UniqueConstraint("first_name", "last_name", name="uq_director_name"),
+        Index(
+            "directors_name_pattern_idx",
+            "last_name",
+            "first_name",
+            postgresql_ops={"last_name": "text_pattern_ops", "first_name": "text_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # One-to-many relationship with Movie
     movies = relationship("Movie", back_populates="director")
 
@@ -101,6 +155,17 @@ class Actor(Base):
     first_name = Column(String(100), nullable=False)
     last_name = Column(String(100), nullable=False)
 
+    __table_args__ = (
+        # One row per person; also the conflict target for upserts
+        UniqueConstraint("first_name", "last_name", name="uq_actor_name"),
+        Index(
+            "actors_name_pattern_idx",
+            "last_name",
+            "first_name",
+            postgresql_ops={"last_name": "text_pattern_ops", "first_name": "text_pattern_ops"},
+        ).ddl_if(dialect="postgresql"),
+    )
+
     # Many-to-many relationship with Movie
     movies = relationship(
         "Movie",
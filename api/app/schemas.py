@@ -75,29 +75,15 @@ class MovieResponse(BaseModel):
     class Config:
         from_attributes = True
 
-    @classmethod
-    def from_orm_movie(cls, movie):
-        """Convert SQLAlchemy Movie model to response schema."""
-        return cls(
-            id=movie.id,
-            name=movie.name,
-            year=movie.year,
-            age_limit=movie.age_limit,
-            rating=movie.rating,
-            synopsis=movie.synopsis,
-            genres=[genre.name for genre in movie.genres],
-            actors=[
-                PersonBase(first_name=actor.first_name, last_name=actor.last_name)
-                for actor in movie.actors
-            ],
-            director=PersonBase(
-                first_name=movie.director.first_name,
-                last_name=movie.director.last_name,
-            ) if movie.director else None,
-        )
+
+class PageCursor(BaseModel):
+    """Keyset cursor pointing at the last movie of a page."""
+    after_sort: str
+    after_id: int
 
 
 class MoviesListResponse(BaseModel):
     """Paginated response for movie list."""
     total: int
     items: List[MovieResponse]
+    next_cursor: Optional[PageCursor] = None
@@ -1,18 +1,39 @@
 """Seed script to load movies from movies-compact.json into database."""
 
-import json
+import csv
+import io
 import os
 from pathlib import Path
+from typing import Iterable, Iterator
+
+import ijson
+from sqlalchemy.engine import Connection
 from sqlalchemy.orm import Session
 
 from .database import SessionLocal, init_db, engine
-from .models import Movie, Genre, Actor, Director, Base
+from .models import Genre, Actor, Director, Base
+
+# Column order of the rows built by iter_seed_batches, in foreign-key dependency order
+SEED_COLUMNS = {
+    "genres": ("id", "name"),
+    "directors": ("id", "first_name", "last_name"),
+    "actors": ("id", "first_name", "last_name"),
+    "movies": ("id", "name", "year", "age_limit", "rating", "synopsis", "director_id"),
+    "movie_genre": ("movie_id", "genre_id"),
+    "movie_actor": ("movie_id", "actor_id"),
+}
+
+# Movies per batch; bounds memory regardless of the input size
+SEED_BATCH_SIZE = 1000
+
+# NULL marker for the COPY CSV stream (see seed_with_copy)
+COPY_NULL = r"\N"
 
 
-def load_movies_from_json(json_path: str) -> list[dict]:
-    """Load movie data from JSON file."""
-    with open(json_path, "r", encoding="utf-8") as f:
-        return json.load(f)
+def iter_movies_from_json(json_path: str) -> Iterator[dict]:
+    """Stream movie objects from a JSON array file without loading it whole."""
+    with open(json_path, "rb") as f:
+        yield from ijson.items(f, "item", use_float=True)
 
 
 def seed_database(json_path: str = None):
@@ -35,107 +56,167 @@ def seed_database(json_path: str = None):
     Base.metadata.drop_all(bind=engine)
     Base.metadata.create_all(bind=engine)
 
-    # Load movies from JSON
+    # Stream movies from JSON
     print(f"Loading movies from {json_path}...")
-    movies_data = load_movies_from_json(json_path)
-    print(f"Found {len(movies_data)} movies")
-
-    # Create session
-    db: Session = SessionLocal()
+    batches = iter_seed_batches(iter_movies_from_json(json_path))
 
     try:
-        # Keep track of entities to avoid duplicates
-        genre_cache = {}
-        director_cache = {}
-        actor_cache = {}
-
-        for idx, movie_data in enumerate(movies_data, 1):
-            # Get or create genres
-            genre_objects = []
-            for genre_name in movie_data.get("genres", []):
-                if genre_name not in genre_cache:
-                    genre = db.query(Genre).filter(Genre.name == genre_name).first()
-                    if not genre:
-                        genre = Genre(name=genre_name)
-                        db.add(genre)
-                        db.flush()  # Get the ID
-                    genre_cache[genre_name] = genre
-                genre_objects.append(genre_cache[genre_name])
-
-            # Get or create director
-            director_obj = None
-            director_data = movie_data.get("director")
-            if director_data:
-                director_key = (director_data["firstName"], director_data["lastName"])
-                if director_key not in director_cache:
-                    director = db.query(Director).filter(
-                        Director.first_name == director_data["firstName"],
-                        Director.last_name == director_data["lastName"],
-                    ).first()
-                    if not director:
-                        director = Director(
-                            first_name=director_data["firstName"],
-                            last_name=director_data["lastName"],
-                        )
-                        db.add(director)
-                        db.flush()
-                    director_cache[director_key] = director
-                director_obj = director_cache[director_key]
-
-            # Get or create actors
-            actor_objects = []
-            for actor_data in movie_data.get("actors", []):
-                actor_key = (actor_data["firstName"], actor_data["lastName"])
-                if actor_key not in actor_cache:
-                    actor = db.query(Actor).filter(
-                        Actor.first_name == actor_data["firstName"],
-                        Actor.last_name == actor_data["lastName"],
-                    ).first()
-                    if not actor:
-                        actor = Actor(
-                            first_name=actor_data["firstName"],
-                            last_name=actor_data["lastName"],
-                        )
-                        db.add(actor)
-                        db.flush()
-                    actor_cache[actor_key] = actor
-                actor_objects.append(actor_cache[actor_key])
-
-            # Create movie (map camelCase ageLimit to snake_case age_limit)
-            movie = Movie(
-                name=movie_data["name"],
-                year=movie_data["year"],
-                age_limit=movie_data.get("ageLimit", 0),
-                rating=movie_data.get("rating", 3),
-                synopsis=movie_data.get("synopsis"),
-                genres=genre_objects,
-                director=director_obj,
-                actors=actor_objects,
-            )
-            db.add(movie)
-
-            if idx % 10 == 0:
-                print(f"  Processed {idx}/{len(movies_data)} movies...")
+        with engine.begin() as conn:
+            if engine.dialect.name == "postgresql":
+                movie_count = seed_with_copy(conn, batches)
+            else:
+                movie_count = seed_with_core(conn, batches)
+    except Exception as e:
+        print(f"\n✗ Error seeding database: {e}")
+        raise
 
-        # Commit all changes
-        db.commit()
-        print(f"\n✓ Successfully seeded {len(movies_data)} movies!")
+    print(f"\n✓ Successfully seeded {movie_count} movies!")
 
-        # Print statistics
+    # Print statistics
+    db: Session = SessionLocal()
+    try:
         genre_count = db.query(Genre).count()
         director_count = db.query(Director).count()
         actor_count = db.query(Actor).count()
         print(f"✓ Created {genre_count} unique genres")
         print(f"✓ Created {director_count} unique directors")
         print(f"✓ Created {actor_count} unique actors")
-
-    except Exception as e:
-        db.rollback()
-        print(f"\n✗ Error seeding database: {e}")
-        raise
     finally:
         db.close()
 
 
+def iter_seed_batches(
+    movies: Iterable[dict], batch_size: int = SEED_BATCH_SIZE
+) -> Iterator[dict[str, list[tuple]]]:
+    """
+    Resolve movie JSON into plain table rows, one batch of movies at a time.
+
+    Tables are freshly created before seeding, so ids can be numbered in Python.
+    Genres, directors and actors are emitted in the batch that first uses them,
+    so every batch can be loaded in SEED_COLUMNS order.
+    """
+    genre_ids = {}
+    director_ids = {}
+    actor_ids = {}
+    rows = {table: [] for table in SEED_COLUMNS}
+
+    for movie_id, movie_data in enumerate(movies, 1):
+        director_id = None
+        director_data = movie_data.get("director")
+        if director_data:
+            director_key = (director_data["firstName"], director_data["lastName"])
+            if director_key not in director_ids:
+                director_ids[director_key] = len(director_ids) + 1
+                rows["directors"].append((director_ids[director_key], *director_key))
+            director_id = director_ids[director_key]
+
+        rows["movies"].append((
+            movie_id,
+            movie_data["name"],
+            movie_data["year"],
+            movie_data.get("ageLimit", 0),
+            movie_data.get("rating", 3),
+            movie_data.get("synopsis"),
+            director_id,
+        ))
+
+        for genre_name in dict.fromkeys(movie_data.get("genres", [])):
+            if genre_name not in genre_ids:
+                genre_ids[genre_name] = len(genre_ids) + 1
+                rows["genres"].append((genre_ids[genre_name], genre_name))
+            rows["movie_genre"].append((movie_id, genre_ids[genre_name]))
+
+        actor_keys = [(a["firstName"], a["lastName"]) for a in movie_data.get("actors", [])]
+        for actor_key in dict.fromkeys(actor_keys):
+            if actor_key not in actor_ids:
+                actor_ids[actor_key] = len(actor_ids) + 1
+                rows["actors"].append((actor_ids[actor_key], *actor_key))
+            rows["movie_actor"].append((movie_id, actor_ids[actor_key]))
+
+        if movie_id % batch_size == 0:
+            yield rows
+            rows = {table: [] for table in SEED_COLUMNS}
+
+    if rows["movies"]:
+        yield rows
+
+
+def seed_with_core(conn: Connection, batches: Iterable[dict[str, list[tuple]]]) -> int:
+    """
+    Bulk load movies with Core executemany inserts (portable path).
+
+    Skips the ORM unit of work entirely; each batch is one executemany per
+    table, all on the caller's connection and transaction. Returns the
+    number of movies.
+    """
+    movie_count = 0
+
+    for rows in batches:
+        for table, columns in SEED_COLUMNS.items():
+            if rows[table]:
+                conn.execute(
+                    Base.metadata.tables[table].insert(),
+                    [dict(zip(columns, row)) for row in rows[table]],
+                )
+        movie_count += len(rows["movies"])
+        print(f"  Inserted {movie_count} movies...")
+
+    return movie_count
+
+
+def seed_with_copy(conn: Connection, batches: Iterable[dict[str, list[tuple]]]) -> int:
+    """
+    Bulk load movies on PostgreSQL with COPY.
+
+    Secondary indexes are dropped before the load and rebuilt afterwards, so
+    they are built once instead of maintained per inserted row. Returns the
+    number of movies.
+    """
+    indexes = [index for table in Base.metadata.sorted_tables for index in table.indexes]
+    movie_count = 0
+
+    print("Dropping indexes for bulk load...")
+    for index in indexes:
+        index.drop(bind=conn)
+
+    cursor = conn.connection.dbapi_connection.cursor()
+    try:
+        for rows in batches:
+            for table, columns in SEED_COLUMNS.items():
+                if not rows[table]:
+                    continue
+                # csv writes None and "" alike as an empty field, which COPY
+                # reads as NULL; spell NULL out so empty strings stay strings
+                buf = io.StringIO()
+                csv.writer(buf).writerows(
+                    [COPY_NULL if value is None else value for value in row] for row in rows[table]
+                )
+                buf.seek(0)
+                cursor.copy_expert(
+                    f"COPY {table} ({', '.join(columns)}) FROM STDIN WITH (FORMAT csv, NULL '{COPY_NULL}')",
+                    buf,
+                )
+            movie_count += len(rows["movies"])
+            print(f"  Copied {movie_count} movies...")
+
+        # Ids were assigned explicitly; move the serial sequences past them
+        for table in ("genres", "directors", "actors", "movies"):
+            cursor.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), "
+                f"(SELECT COALESCE(MAX(id), 0) + 1 FROM {table}), false)"
+            )
+    finally:
+        cursor.close()
+
+    print("Rebuilding indexes...")
+    for index in indexes:
+        index.create(bind=conn)
+
+    # Refresh planner statistics for the freshly loaded tables
+    conn.exec_driver_sql("ANALYZE")
+
+    return movie_count
+
+
 if __name__ == "__main__":
     seed_database()
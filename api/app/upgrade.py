@@ -0,0 +1,151 @@
+"""Upgrade an existing database in place to the current schema.
+
+create_all() only creates missing tables; it never alters existing ones.
+This script applies the schema changes made since a database was created,
+without dropping data (unlike the seed script):
+
+- creates missing tables, and the pg_trgm extension on PostgreSQL
+- adds the unique actor and director name constraints, merging duplicates
+- creates every index declared on the models that is missing, and drops the
+  single-column movie indexes they replaced
+
+    python -m app.upgrade
+
+It is safe to run repeatedly; steps that are already applied are skipped.
+"""
+
+from sqlalchemy import Integer, and_, bindparam, delete, func, insert, inspect, select, update
+from sqlalchemy.engine import Connection
+from sqlalchemy.schema import AddConstraint
+
+from .database import Base, engine, has_unique_key
+from .models import Actor, Director, Movie, movie_actor
+
+NAME_COLUMNS = ("first_name", "last_name")
+
+# Single-column movie indexes replaced by the (<column>, id) listing indexes
+SUPERSEDED_INDEXES = ("ix_movies_name", "ix_movies_year", "ix_movies_rating")
+
+
+def _duplicate_people(conn: Connection, table) -> list[dict]:
+    """Map every duplicate person row to the lowest id sharing its name."""
+    keepers = (
+        select(table.c.first_name, table.c.last_name, func.min(table.c.id).label("keep_id"))
+        .group_by(table.c.first_name, table.c.last_name)
+        .having(func.count() > 1)
+        .subquery()
+    )
+    rows = conn.execute(
+        select(table.c.id, keepers.c.keep_id)
+        .join(
+            keepers,
+            and_(table.c.first_name == keepers.c.first_name, table.c.last_name == keepers.c.last_name),
+        )
+        .where(table.c.id != keepers.c.keep_id)
+    ).all()
+    return [{"dup_id": dup_id, "keep_id": keep_id} for dup_id, keep_id in rows]
+
+
+def _merge_duplicate_actors(conn: Connection, pairs: list[dict]):
+    """Move movie links from duplicate actors to the kept row, then drop the duplicates."""
+    keep_id = bindparam("keep_id", type_=Integer)
+    dup_id = bindparam("dup_id", type_=Integer)
+    already_linked = select(movie_actor.c.movie_id).where(movie_actor.c.actor_id == keep_id)
+    # A movie may list two copies of the same person; link it to the keeper once
+    conn.execute(
+        insert(movie_actor).from_select(
+            ["movie_id", "actor_id"],
+            select(movie_actor.c.movie_id, keep_id).where(
+                movie_actor.c.actor_id == dup_id,
+                movie_actor.c.movie_id.not_in(already_linked),
+            ),
+        ),
+        pairs,
+    )
+    conn.execute(delete(movie_actor).where(movie_actor.c.actor_id == dup_id), pairs)
+    conn.execute(delete(Actor.__table__).where(Actor.id == dup_id), pairs)
+
+
+def _merge_duplicate_directors(conn: Connection, pairs: list[dict]):
+    """Point movies at the kept director row, then drop the duplicates."""
+    keep_id = bindparam("keep_id", type_=Integer)
+    dup_id = bindparam("dup_id", type_=Integer)
+    conn.execute(
+        update(Movie.__table__).where(Movie.director_id == dup_id).values(director_id=keep_id),
+        pairs,
+    )
+    conn.execute(delete(Director.__table__).where(Director.id == dup_id), pairs)
+
+
+def add_unique_person_names(conn: Connection):
+    """
+    Add uq_actor_name and uq_director_name to databases created without them.
+
+    Existing duplicates are merged into the row with the lowest id first, with
+    their movie links repointed, since the constraints cannot be added while
+    duplicates remain.
+    """
+    people = (
+        (Actor, "uq_actor_name", _merge_duplicate_actors),
+        (Director, "uq_director_name", _merge_duplicate_directors),
+    )
+    for model, constraint_name, merge in people:
+        table = model.__table__
+        if has_unique_key(conn, table.name, NAME_COLUMNS):
+            print(f"  {table.name}: unique name constraint already present")
+            continue
+
+        pairs = _duplicate_people(conn, table)
+        if pairs:
+            merge(conn, pairs)
+        print(f"  {table.name}: merged {len(pairs)} duplicate rows")
+
+        constraint = next(c for c in table.constraints if c.name == constraint_name)
+        if conn.dialect.name == "sqlite":
+            # SQLite cannot add constraints to an existing table; a unique
+            # index is equivalent for lookups and ON CONFLICT
+            conn.exec_driver_sql(f"CREATE UNIQUE INDEX {constraint.name} ON {table.name} (first_name, last_name)")
+        else:
+            conn.execute(AddConstraint(constraint))
+        print(f"  {table.name}: added {constraint.name}")
+
+
+def _index_names(conn: Connection) -> set[str]:
+    inspector = inspect(conn)
+    return {index["name"] for table in Base.metadata.sorted_tables for index in inspector.get_indexes(table.name)}
+
+
+def sync_indexes(conn: Connection):
+    """Create indexes declared on the models but missing from the database; drop superseded ones."""
+    before = _index_names(conn)
+    for name in SUPERSEDED_INDEXES:
+        if name in before:
+            conn.exec_driver_sql(f"DROP INDEX {name}")
+            print(f"  dropped {name}")
+
+    # Dialect-specific indexes (ddl_if) are skipped on other databases
+    for table in Base.metadata.sorted_tables:
+        for index in table.indexes:
+            index.create(bind=conn, checkfirst=True)
+    for name in sorted(_index_names(conn) - before):
+        print(f"  created {name}")
+
+
+def upgrade_schema(conn: Connection):
+    """Apply every upgrade step on the given connection."""
+    # Missing tables, plus the pg_trgm extension (a before_create hook on PostgreSQL)
+    Base.metadata.create_all(bind=conn)
+    add_unique_person_names(conn)
+    sync_indexes(conn)
+
+
+def upgrade_database():
+    """Apply every upgrade step in one transaction."""
+    print("Upgrading database schema...")
+    with engine.begin() as conn:
+        upgrade_schema(conn)
+    print("✓ Database is up to date")
+
+
+if __name__ == "__main__":
+    upgrade_database()
@@ -1,23 +1,112 @@
 """API endpoint tests."""
 
+from contextlib import contextmanager
+
+import orjson
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
+from sqlalchemy import create_engine, event, insert, select
 from sqlalchemy.orm import sessionmaker
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.pool import NullPool
 
-from app.main import app
 from app.database import Base, get_db
+from app.schemas import MovieCreate
 from app.models import Movie, Genre, Actor, Director, movie_genre, movie_actor  # Import models to register with Base
 
-# Use in-memory SQLite for tests with StaticPool to ensure same database across connections
-TEST_DATABASE_URL = "sqlite:///:memory:"
-engine = create_engine(
-    TEST_DATABASE_URL,
-    connect_args={"check_same_thread": False},
-    poolclass=StaticPool,  # Important: share same in-memory database across connections
+
+def j(response):
+    """Parse a JSON response body with orjson."""
+    return orjson.loads(response.content)
+
+
+# Request bodies serialized once at import; post with content=..., headers=JSON_HEADERS
+JSON_HEADERS = {"content-type": "application/json"}
+
+
+def _payload(**fields):
+    """Validate a movie payload once with the API's request schema and serialize it."""
+    return MovieCreate(**fields).model_dump_json(by_alias=True).encode()
+
+
+CREATE_MOVIE_BYTES = _payload(
+    name="Test Movie",
+    year=2024,
+    age_limit=12,
+    rating=4,
+    synopsis="A test movie",
+    genres=["Action", "Comedy"],
 )
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+SPACE_ADVENTURE_BYTES = _payload(
+    name="Space Adventure",
+    year=2020,
+    age_limit=12,
+    rating=4,
+    genres=["Sci-Fi", "Thriller"],
+    actors=[
+        {"firstName": "Tom", "lastName": "Hanks"},
+        {"firstName": "Meryl", "lastName": "Streep"},
+    ],
+    director={"firstName": "Steven", "lastName": "Spielberg"},
+)
+
+# Two movies share a year so the cursor's id tiebreaker is exercised
+CURSOR_MOVIES_BYTES = [
+    _payload(name=f"Movie {i}", year=year, age_limit=0, rating=3, genres=["Drama"])
+    for i, year in enumerate([2020, 2021, 2021, 2022, 2023])
+]
+
+NDJSON_MOVIES_BYTES = [
+    _payload(name=f"Movie {i}", year=2020 + i, age_limit=0, rating=3, genres=["Drama"])
+    for i in range(3)
+]
+
+# Each xdist worker ("master" without -n) gets its own named in-memory database
+TEST_DATABASE_URL = "sqlite:///file:test_{worker_id}?mode=memory&cache=shared&uri=true"
+
+
+# pysqlite's own transaction handling breaks SAVEPOINT; let SQLAlchemy emit BEGIN
+def _disable_pysqlite_transactions(dbapi_connection, _connection_record):
+    dbapi_connection.isolation_level = None
+
+
+# Test data is disposable: skip fsync and on-disk journaling (test engine only)
+def _fast_sqlite_pragmas(dbapi_connection, _connection_record):
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA synchronous=OFF")
+    cursor.execute("PRAGMA journal_mode=MEMORY")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA cache_size=-64000")
+    cursor.close()
+
+
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+# SELECTs issued on the test engine, for query budgets. A plain counter rather
+# than a ContextVar: requests execute in TestClient's worker threads.
+_query_counter = {"selects": 0}
+
+
+def _count_selects(conn, cursor, statement, parameters, context, executemany):
+    if statement.lstrip().upper().startswith("SELECT"):
+        _query_counter["selects"] += 1
+
+
+# Sessions join the per-test transaction; their commits only release a SAVEPOINT
+TestingSessionLocal = sessionmaker(
+    autocommit=False,
+    autoflush=False,
+    join_transaction_mode="create_savepoint",
+)
+
+
+def invalidate_api_caches():
+    """Clear the API's in-process caches (imports app.main lazily)."""
+    from app.main import invalidate_caches
+
+    invalidate_caches()
 
 
 def override_get_db():
@@ -29,64 +118,218 @@ def override_get_db():
         db.close()
 
 
-# Set up dependency override at module level
-app.dependency_overrides[get_db] = override_get_db
+@pytest.fixture(scope="session")
+def engine(worker_id):
+    """Test engine for this worker, built lazily so parallel workers never share state."""
+    # Shared-cache URI: every connection opens the same in-memory database, so
+    # no single pooled DBAPI handle is needed. The session-wide `connection`
+    # fixture keeps it alive (it is destroyed when the last connection closes).
+    # check_same_thread=False: requests use that connection from worker threads.
+    engine = create_engine(
+        TEST_DATABASE_URL.format(worker_id=worker_id),
+        connect_args={"check_same_thread": False},
+        poolclass=NullPool,
+    )
+    event.listen(engine, "connect", _disable_pysqlite_transactions)
+    event.listen(engine, "connect", _fast_sqlite_pragmas)
+    event.listen(engine, "begin", _emit_begin)
+    event.listen(engine, "before_cursor_execute", _count_selects)
+    yield engine
+    engine.dispose()
+
+
+@pytest.fixture(scope="session", autouse=True)
+def connection(engine):
+    """
+    Hold one connection for the whole test session.
+
+    Tables are created once on it and every test runs on it, so SQLite's page
+    cache stays warm and no connection is set up or torn down per test.
+    """
+    with engine.connect() as conn:
+        Base.metadata.create_all(bind=conn)
+        conn.commit()
+        yield conn
+        Base.metadata.drop_all(bind=conn)
+        conn.commit()
 
 
 @pytest.fixture(autouse=True)
-def setup_database():
-    """Create tables before each test and drop after."""
-    # Create tables on test engine
-    Base.metadata.create_all(bind=engine)
+def db_session(connection):
+    """
+    Run each test inside an outer transaction that is rolled back afterwards.
+
+    Request sessions and this session are bound to the shared connection, so
+    everything a test writes is discarded without dropping tables.
+    """
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
+    session = TestingSessionLocal()
+    yield session
+    session.close()
+    transaction.rollback()
+    invalidate_api_caches()
+
+
+@pytest.fixture(scope="session")
+def app():
+    """
+    The FastAPI app under test.
+
+    Imported here rather than at module level, so collecting tests does not
+    build the app.
+    """
+    from app.main import app as _app
+
+    return _app
+
+
+@pytest.fixture(scope="session", autouse=True)
+def test_db_override(app):
+    """Wire the test database in once per session and restore production wiring afterwards."""
+    assert get_db not in app.dependency_overrides, "get_db override is already installed"
+    app.dependency_overrides[get_db] = override_get_db
     yield
-    # Clean up
-    Base.metadata.drop_all(bind=engine)
+    app.dependency_overrides.pop(get_db, None)
+
 
+@pytest.fixture(scope="session")
+def client(app, test_db_override):
+    """Test client shared by all tests; app startup and shutdown run once."""
+    with TestClient(app, raise_server_exceptions=True) as c:
+        yield c
 
-#Create test client
-client = TestClient(app, raise_server_exceptions=True)
 
+@pytest.fixture(scope="session", autouse=True)
+def warmup(client, connection):
+    """
+    Hit every endpoint once before the first test, inside a rolled-back transaction.
 
-def test_root_endpoint():
+    Route resolution and SQLAlchemy's compiled-statement cache are filled here,
+    so whichever test runs first per endpoint does not pay for it.
+    """
+    transaction = connection.begin()
+    TestingSessionLocal.configure(bind=connection)
+    try:
+        client.get("/")
+        client.get("/api/movies")
+        client.get("/api/genres")
+        client.post("/api/movies", content=CREATE_MOVIE_BYTES, headers=JSON_HEADERS)
+    finally:
+        transaction.rollback()
+        invalidate_api_caches()
+
+
+@pytest.fixture
+def query_budget():
+    """Context manager failing the test if the block issues more than max_queries SELECTs."""
+    @contextmanager
+    def _budget(max_queries):
+        start = _query_counter["selects"]
+        yield
+        used = _query_counter["selects"] - start
+        assert used <= max_queries, f"{used} queries issued, budget is {max_queries}"
+
+    return _budget
+
+
+def _ensure_genres(session, names):
+    """Insert any missing genres in one statement and return a name -> id mapping."""
+    names = list(dict.fromkeys(names))
+    if not names:
+        return {}
+    session.execute(insert(Genre).prefix_with("OR IGNORE"), [{"name": name} for name in names])
+    return dict(session.execute(select(Genre.name, Genre.id).where(Genre.name.in_(names))).all())
+
+
+@pytest.fixture
+def seed_movies(db_session):
+    """
+    Insert movies straight into the database, bypassing the API.
+
+    Takes a list of movie dicts shaped like the POST payload (genres only) and
+    writes genres, movies and movie_genre rows with one bulk insert each, then
+    commits once. Returns the new movie ids in input order.
+    """
+    def _seed(movies):
+        genre_ids = _ensure_genres(db_session, {name for movie in movies for name in movie["genres"]})
+
+        movie_ids = db_session.scalars(
+            insert(Movie).returning(Movie.id, sort_by_parameter_order=True),
+            [
+                {
+                    "name": movie["name"],
+                    "year": movie["year"],
+                    "age_limit": movie["age_limit"],
+                    "rating": movie["rating"],
+                    "synopsis": movie.get("synopsis"),
+                }
+                for movie in movies
+            ],
+        ).all()
+        links = [
+            {"movie_id": movie_id, "genre_id": genre_ids[name]}
+            for movie_id, movie in zip(movie_ids, movies)
+            for name in dict.fromkeys(movie["genres"])
+        ]
+        if links:
+            db_session.execute(insert(movie_genre), links)
+        db_session.commit()
+        # Direct writes bypass the API, which is what normally clears its caches
+        invalidate_api_caches()
+        return movie_ids
+
+    return _seed
+
+
+@pytest.fixture
+def make_movie(seed_movies):
+    """Create one movie directly, bypassing the API; returns its id."""
+    def _make(name, year=2020, age_limit=0, rating=3, genres=(), synopsis=None):
+        [movie_id] = seed_movies([{
+            "name": name,
+            "year": year,
+            "age_limit": age_limit,
+            "rating": rating,
+            "synopsis": synopsis,
+            "genres": genres,
+        }])
+        return movie_id
+
+    return _make
+
+
+def test_root_endpoint(client):
     """Test health check endpoint."""
     response = client.get("/")
     assert response.status_code == 200
-    assert response.json()["status"] == "ok"
+    assert j(response)["status"] == "ok"
 
 
-def test_create_movie():
+def test_create_movie(client):
     """Test creating a new movie."""
-    movie_data = {
-        "name": "Test Movie",
-        "year": 2024,
-        "age_limit": 12,
-        "rating": 4,
-        "synopsis": "A test movie",
-        "genres": ["Action", "Comedy"],
-    }
-
-    response = client.post("/api/movies", json=movie_data)
+    response = client.post("/api/movies", content=CREATE_MOVIE_BYTES, headers=JSON_HEADERS)
     assert response.status_code == 201
 
-    data = response.json()
+    data = j(response)
     assert data["id"] > 0
     assert data["name"] == "Test Movie"
     assert data["year"] == 2024
     assert data["rating"] == 4
-    assert set(data["genres"]) == {"Action", "Comedy"}
+    assert sorted(data["genres"]) == ["Action", "Comedy"]
 
 
-def test_get_movies_empty():
+def test_get_movies_empty(client):
     """Test getting movies from empty database."""
     response = client.get("/api/movies")
     assert response.status_code == 200
 
-    data = response.json()
+    data = j(response)
     assert data["total"] == 0
     assert data["items"] == []
 
 
-def test_get_movies_with_data():
+def test_get_movies_with_data(client, seed_movies, query_budget):
     """Test getting movies after adding some."""
     # Add test movies
     movies = [
@@ -106,46 +349,50 @@ def test_get_movies_with_data():
         },
     ]
 
-    for movie in movies:
-        client.post("/api/movies", json=movie)
+    seed_movies(movies)
 
-    response = client.get("/api/movies")
+    # Count, movies with director, genres, actors: independent of row count
+    with query_budget(4):
+        response = client.get("/api/movies")
     assert response.status_code == 200
 
-    data = response.json()
+    data = j(response)
     assert data["total"] == 2
     assert len(data["items"]) == 2
 
 
-def test_search_movies():
+def test_create_movie_refreshes_cached_total(client):
+    """Test creating a movie through the API invalidates the cached movie total."""
+    assert j(client.get("/api/movies"))["total"] == 0
+
+    response = client.post("/api/movies", content=CREATE_MOVIE_BYTES, headers=JSON_HEADERS)
+    assert response.status_code == 201
+
+    data = j(client.get("/api/movies"))
+    assert data["total"] == 1
+    assert len(data["items"]) == 1
+
+
+def test_search_movies(client, make_movie):
     """Test searching movies by name."""
     # Add test movie
-    client.post(
-        "/api/movies",
-        json={
-            "name": "Alien Invasion",
-            "year": 2020,
-            "age_limit": 12,
-            "rating": 4,
-            "genres": ["Sci-Fi"],
-        },
-    )
+    make_movie(name="Alien Invasion", year=2020, age_limit=12, rating=4, genres=["Sci-Fi"])
 
     # Search for it
     response = client.get("/api/movies?search=alien")
     assert response.status_code == 200
 
-    data = response.json()
+    data = j(response)
     assert data["total"] == 1
     assert data["items"][0]["name"] == "Alien Invasion"
 
     # Search for non-existent
     response = client.get("/api/movies?search=zombie")
     assert response.status_code == 200
-    assert response.json()["total"] == 0
+    assert j(response)["total"] == 0
 
 
-def test_sort_movies():
+def test_sort_movies(client, seed_movies):
     """Test sorting movies."""
     # Add movies with different years
     movies = [
@@ -154,170 +401,256 @@ def test_sort_movies():
         {"name": "Mid Movie", "year": 2015, "age_limit": 0, "rating": 4, "genres": ["Comedy"]},
     ]
 
-    for movie in movies:
-        client.post("/api/movies", json=movie)
+    seed_movies(movies)
 
     # Sort by year descending (default)
     response = client.get("/api/movies?sort=year&order=desc")
-    data = response.json()
+    data = j(response)
     assert data["items"][0]["year"] == 2023
     assert data["items"][1]["year"] == 2015
     assert data["items"][2]["year"] == 2000
 
     # Sort by rating ascending
     response = client.get("/api/movies?sort=rating&order=asc")
-    data = response.json()
+    data = j(response)
     assert data["items"][0]["rating"] == 3
     assert data["items"][1]["rating"] == 4
     assert data["items"][2]["rating"] == 5
 
 
-def test_pagination():
+def test_pagination(client, seed_movies):
     """Test pagination."""
     # Add 5 movies
-    for i in range(5):
-        client.post(
-            "/api/movies",
-            json={
-                "name": f"Movie {i}",
-                "year": 2020 + i,
-                "age_limit": 0,
-                "rating": 3,
-                "genres": ["Drama"],
-            },
-        )
+    seed_movies([
+        {
+            "name": f"Movie {i}",
+            "year": 2020 + i,
+            "age_limit": 0,
+            "rating": 3,
+            "genres": ["Drama"],
+        }
+        for i in range(5)
+    ])
 
     # Get first 2
     response = client.get("/api/movies?limit=2&offset=0")
-    data = response.json()
+    data = j(response)
     assert data["total"] == 5
     assert len(data["items"]) == 2
 
     # Get next 2
     response = client.get("/api/movies?limit=2&offset=2")
-    data = response.json()
+    data = j(response)
     assert data["total"] == 5
     assert len(data["items"]) == 2
 
 
-def test_get_genres():
+def test_get_genres(client, make_movie):
     """Test getting all genres."""
     # Initially empty
     response = client.get("/api/genres")
     assert response.status_code == 200
-    assert response.json() == []
+    assert j(response) == []
 
     # Add movie with genres
-    client.post(
-        "/api/movies",
-        json={
-            "name": "Test",
-            "year": 2020,
-            "age_limit": 0,
-            "rating": 3,
-            "genres": ["Action", "Comedy", "Drama"],
-        },
-    )
+    make_movie(name="Test", genres=["Action", "Comedy", "Drama"])
 
     # Should have 3 genres
     response = client.get("/api/genres")
     assert response.status_code == 200
-    genres = response.json()
+    genres = j(response)
     assert len(genres) == 3
-    assert set(genres) == {"Action", "Comedy", "Drama"}
+    assert sorted(genres) == ["Action", "Comedy", "Drama"]
+
+
+def test_writes_refresh_cached_genres(client):
+    """Test creating and updating movies through the API invalidates the cached genre list."""
+    assert j(client.get("/api/genres")) == []
+
+    created = j(client.post("/api/movies", content=CREATE_MOVIE_BYTES, headers=JSON_HEADERS))
+    assert j(client.get("/api/genres")) == ["Action", "Comedy"]
 
+    response = client.put(
+        f"/api/movies/{created['id']}",
+        content=_payload(name="Test Movie", year=2024, age_limit=12, rating=4, genres=["Western"]),
+        headers=JSON_HEADERS,
+    )
+    assert response.status_code == 200
+    assert j(client.get("/api/genres")) == ["Action", "Comedy", "Western"]
 
-def test_search_genres_actors_directors():
+
+def test_search_genres_actors_directors(client):
     """Test searching by genre, actor, and director names."""
     # Add movie with actor, director, and genres
-    client.post(
-        "/api/movies",
-        json={
-            "name": "Space Adventure",
-            "year": 2020,
-            "age_limit": 12,
-            "rating": 4,
-            "genres": ["Sci-Fi", "Thriller"],
-            "actors": [
-                {"firstName": "Tom", "lastName": "Hanks"},
-                {"firstName": "Meryl", "lastName": "Streep"},
-            ],
-            "director": {"firstName": "Steven", "lastName": "Spielberg"},
-        },
-    )
+    client.post("/api/movies", content=SPACE_ADVENTURE_BYTES, headers=JSON_HEADERS)
 
     # Search by genre
     response = client.get("/api/movies?search=sci-fi")
     assert response.status_code == 200
-    data = response.json()
+    data = j(response)
     assert data["total"] == 1
     assert data["items"][0]["name"] == "Space Adventure"
 
     # Search by actor first name
     response = client.get("/api/movies?search=tom")
     assert response.status_code == 200
-    data = response.json()
+    data = j(response)
     assert data["total"] == 1
 
     # Search by actor last name
     response = client.get("/api/movies?search=streep")
     assert response.status_code == 200
-    data = response.json()
+    data = j(response)
     assert data["total"] == 1
 
     # Search by director first name
     response = client.get("/api/movies?search=steven")
     assert response.status_code == 200
-    data = response.json()
+    data = j(response)
     assert data["total"] == 1
 
     # Search by director last name
     response = client.get("/api/movies?search=spielberg")
     assert response.status_code == 200
-    data = response.json()
+    data = j(response)
     assert data["total"] == 1
 
     # Search for non-existent
     response = client.get("/api/movies?search=notfound")
     assert response.status_code == 200
-    assert response.json()["total"] == 0
+    assert j(response)["total"] == 0
+
+
+@pytest.mark.parametrize(
+    "payload",
+    [
+        # Missing required fields (age_limit, rating, genres)
+        orjson.dumps({"name": "Test", "year": 2020}),
+        # Invalid year: too old
+        orjson.dumps({"name": "Test", "year": 1500, "age_limit": 0, "rating": 3, "genres": ["Action"]}),
+        # Invalid rating: out of range
+        orjson.dumps({"name": "Test", "year": 2020, "age_limit": 0, "rating": 10, "genres": ["Action"]}),
+    ],
+    ids=["missing-fields", "invalid-year", "invalid-rating"],
+)
+def test_create_movie_validation(client, payload):
+    """Test validation on movie creation."""
+    response = client.post("/api/movies", content=payload, headers=JSON_HEADERS)
+    assert response.status_code == 422
 
 
-def test_create_movie_validation():
-    """Test validation on movie creation."""
-    # Missing required field
-    response = client.post(
+def test_update_movie_reuses_existing_entities(client):
+    """Test updating a movie reuses genres, actors, and directors that already exist."""
+    client.post(
         "/api/movies",
-        json={
-            "name": "Test",
-            "year": 2020,
-            # missing age_limit, rating, genres
-        },
+        content=_payload(
+            name="First",
+            year=2020,
+            age_limit=0,
+            rating=3,
+            genres=["Drama"],
+            actors=[{"firstName": "Tom", "lastName": "Hanks"}],
+            director={"firstName": "Steven", "lastName": "Spielberg"},
+        ),
+        headers=JSON_HEADERS,
     )
-    assert response.status_code == 422
-
-    # Invalid year
-    response = client.post(
+    created = j(client.post(
         "/api/movies",
-        json={
-            "name": "Test",
-            "year": 1500,  # Too old
-            "age_limit": 0,
-            "rating": 3,
-            "genres": ["Action"],
-        },
+        content=_payload(name="Second", year=2021, age_limit=0, rating=4, genres=["Action"]),
+        headers=JSON_HEADERS,
+    ))
+
+    response = client.put(
+        f"/api/movies/{created['id']}",
+        content=_payload(
+            name="Second",
+            year=2021,
+            age_limit=0,
+            rating=4,
+            genres=["Drama", "Comedy"],
+            actors=[
+                {"firstName": "Tom", "lastName": "Hanks"},
+                {"firstName": "Meryl", "lastName": "Streep"},
+            ],
+            director={"firstName": "Steven", "lastName": "Spielberg"},
+        ),
+        headers=JSON_HEADERS,
     )
-    assert response.status_code == 422
+    assert response.status_code == 200
+    data = j(response)
+    assert sorted(data["genres"]) == ["Comedy", "Drama"]
+    assert sorted(a["lastName"] for a in data["actors"]) == ["Hanks", "Streep"]
+    assert data["director"] == {"firstName": "Steven", "lastName": "Spielberg"}
+
+    assert j(client.get("/api/genres")) == ["Action", "Comedy", "Drama"]
+    assert len(j(client.get("/api/actors"))) == 2
+    assert len(j(client.get("/api/directors"))) == 1
+
+
+def test_update_movie_skips_lookups_for_linked_entities(client, query_budget):
+    """Test updating a movie with unchanged relationships does not look up its genres, actors or director."""
+    created = j(client.post("/api/movies", content=SPACE_ADVENTURE_BYTES, headers=JSON_HEADERS))
+
+    # Loading the movie and reading it back after commit (3 + 3); looking up
+    # its genres, actors and director again would add 3 more
+    with query_budget(6):
+        response = client.put(f"/api/movies/{created['id']}", content=SPACE_ADVENTURE_BYTES, headers=JSON_HEADERS)
+    assert response.status_code == 200
+    data = j(response)
+    assert sorted(data["genres"]) == ["Sci-Fi", "Thriller"]
+    assert sorted(a["lastName"] for a in data["actors"]) == ["Hanks", "Streep"]
+    assert data["director"] == {"firstName": "Steven", "lastName": "Spielberg"}
+
+
+def test_cursor_pagination(client):
+    """Test keyset pagination with next_cursor."""
+    created = [
+        j(client.post("/api/movies", content=payload, headers=JSON_HEADERS))
+        for payload in CURSOR_MOVIES_BYTES
+    ]
+
+    seen = []
+    params = {"sort": "year", "order": "desc", "limit": 2}
+    while True:
+        data = j(client.get("/api/movies", params=params))
+        assert data["total"] == 5
+        seen.extend(item["name"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params.update(data["next_cursor"])
 
-    # Invalid rating
-    response = client.post(
+    assert seen == ["Movie 4", "Movie 3", "Movie 2", "Movie 1", "Movie 0"]
+
+    # Ascending by name
+    response = client.get(
         "/api/movies",
-        json={
-            "name": "Test",
-            "year": 2020,
-            "age_limit": 0,
-            "rating": 10,  # Out of range
-            "genres": ["Action"],
-        },
+        params={"sort": "name", "order": "asc", "after_sort": "Movie 1", "after_id": created[1]["id"]},
     )
-    assert response.status_code == 422
+    assert [item["name"] for item in j(response)["items"]] == ["Movie 2", "Movie 3", "Movie 4"]
+
+    # Cursor must be complete and match the sort column type
+    assert client.get("/api/movies?after_id=1").status_code == 422
+    assert client.get("/api/movies?sort=year&after_sort=abc&after_id=1").status_code == 422
+
+
+def test_get_movies_ndjson(client):
+    """Test streaming the movie list as NDJSON when requested."""
+    for payload in NDJSON_MOVIES_BYTES:
+        client.post("/api/movies", content=payload, headers=JSON_HEADERS)
+
+    response = client.get("/api/movies?limit=2", headers={"Accept": "application/x-ndjson"})
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    assert response.headers["x-total-count"] == "3"
+    assert response.headers["x-next-after-sort"] == "2021"
+
+    lines = response.text.splitlines()
+    assert [orjson.loads(line)["name"] for line in lines] == ["Movie 2", "Movie 1"]
+
+    # Browser clients can only read the pagination headers if CORS exposes them
+    response = client.get(
+        "/api/movies?limit=2",
+        headers={"Accept": "application/x-ndjson", "Origin": "http://localhost:5173"},
+    )
+    exposed = {h.strip().lower() for h in response.headers["access-control-expose-headers"].split(",")}
+    assert {"x-total-count", "x-next-after-sort", "x-next-after-id"} <= exposed
@@ -0,0 +1,106 @@
+"""Tests for the batched seed loader."""
+
+import pytest
+from sqlalchemy import create_engine, func, select
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base
+from app.models import Actor, Director, Genre, Movie, movie_actor, movie_genre
+from app.seed import iter_seed_batches, seed_with_core
+
+
+def _person(first_name, last_name):
+    return {"firstName": first_name, "lastName": last_name}
+
+
+# Five movies in the seed JSON shape. Drama and Tom Hanks recur across
+# batches of two; "Repeats" lists a genre and an actor twice.
+MOVIES = [
+    {"name": "One", "year": 2001, "ageLimit": 7, "rating": 4, "genres": ["Drama"],
+     "actors": [_person("Tom", "Hanks")], "director": _person("Steven", "Spielberg")},
+    {"name": "Two", "year": 2002, "genres": ["Comedy"], "actors": [], "director": None},
+    {"name": "Three", "year": 2003, "genres": ["Drama", "Action"],
+     "actors": [_person("Meryl", "Streep")], "director": _person("Steven", "Spielberg")},
+    {"name": "Repeats", "year": 2004, "genres": ["Drama", "Drama"],
+     "actors": [_person("Tom", "Hanks"), _person("Tom", "Hanks")]},
+    {"name": "Five", "year": 2005, "synopsis": "", "genres": ["Western"],
+     "actors": [_person("Tom", "Hanks")], "director": _person("Greta", "Gerwig")},
+]
+
+
+@pytest.fixture
+def conn():
+    """Connection to an empty in-memory database with the current schema."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    with engine.begin() as connection:
+        yield connection
+    engine.dispose()
+
+
+def test_iter_seed_batches_emits_entities_once():
+    """Test batches hold batch_size movies and each entity appears in the first batch that uses it."""
+    batches = list(iter_seed_batches(MOVIES, batch_size=2))
+
+    assert [len(batch["movies"]) for batch in batches] == [2, 2, 1]
+    assert [[name for _, name in batch["genres"]] for batch in batches] == [
+        ["Drama", "Comedy"],
+        ["Action"],
+        ["Western"],
+    ]
+    assert [[row[1:] for row in batch["actors"]] for batch in batches] == [
+        [("Tom", "Hanks")],
+        [("Meryl", "Streep")],
+        [],
+    ]
+    assert [[row[1:] for row in batch["directors"]] for batch in batches] == [
+        [("Steven", "Spielberg")],
+        [],
+        [("Greta", "Gerwig")],
+    ]
+    # Repeated genres and actors within one movie are linked once
+    assert batches[1]["movie_genre"] == [(3, 1), (3, 3), (4, 1)]
+    assert batches[1]["movie_actor"] == [(3, 2), (4, 1)]
+
+
+def test_seed_with_core_loads_batches(conn):
+    """Test loading small batches with seed_with_core yields the expected rows and links."""
+    assert seed_with_core(conn, iter_seed_batches(MOVIES, batch_size=2)) == 5
+
+    def count(table):
+        return conn.execute(select(func.count()).select_from(table)).scalar()
+
+    assert count(Movie) == 5
+    assert count(Genre) == 4
+    assert count(Actor) == 2
+    assert count(Director) == 2
+    assert count(movie_genre) == 6
+    assert count(movie_actor) == 4
+
+    links = conn.execute(
+        select(Movie.name, Genre.name)
+        .join(movie_genre, movie_genre.c.movie_id == Movie.id)
+        .join(Genre, Genre.id == movie_genre.c.genre_id)
+        .where(Genre.name == "Drama")
+        .order_by(Movie.id)
+    ).all()
+    assert [movie for movie, _ in links] == ["One", "Three", "Repeats"]
+
+    hanks_movies = conn.execute(
+        select(Movie.name)
+        .join(movie_actor, movie_actor.c.movie_id == Movie.id)
+        .join(Actor, Actor.id == movie_actor.c.actor_id)
+        .where(Actor.last_name == "Hanks")
+        .order_by(Movie.id)
+    ).scalars().all()
+    assert hanks_movies == ["One", "Repeats", "Five"]
+
+    rows = conn.execute(
+        select(Movie.name, Movie.age_limit, Movie.rating, Movie.synopsis, Director.last_name)
+        .outerjoin(Director, Director.id == Movie.director_id)
+        .order_by(Movie.id)
+    ).all()
+    assert rows[0] == ("One", 7, 4, None, "Spielberg")
+    # Defaults for missing ageLimit / rating; empty synopsis stays a string
+    assert rows[1] == ("Two", 0, 3, None, None)
+    assert rows[4] == ("Five", 0, 3, "", "Gerwig")
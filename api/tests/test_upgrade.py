@@ -0,0 +1,148 @@
+"""Tests for upgrading databases created from an older schema."""
+
+import pytest
+from sqlalchemy import create_engine, inspect, select
+from sqlalchemy.orm import Session
+from sqlalchemy.pool import StaticPool
+
+from app.database import Base, has_unique_key
+from app.models import Actor, Director, Movie, movie_actor
+from app.schemas import PersonBase
+from app.upgrade import add_unique_person_names, upgrade_schema
+
+# Schema as created by the original models: no unique person names, and
+# single-column movie indexes instead of the (<column>, id) listing indexes
+LEGACY_SCHEMA = [
+    """CREATE TABLE genres (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(50) NOT NULL
+    )""",
+    "CREATE UNIQUE INDEX ix_genres_name ON genres (name)",
+    "CREATE INDEX ix_genres_id ON genres (id)",
+    """CREATE TABLE directors (
+        id INTEGER NOT NULL PRIMARY KEY,
+        first_name VARCHAR(100) NOT NULL,
+        last_name VARCHAR(100) NOT NULL
+    )""",
+    "CREATE INDEX ix_directors_id ON directors (id)",
+    """CREATE TABLE actors (
+        id INTEGER NOT NULL PRIMARY KEY,
+        first_name VARCHAR(100) NOT NULL,
+        last_name VARCHAR(100) NOT NULL
+    )""",
+    "CREATE INDEX ix_actors_id ON actors (id)",
+    """CREATE TABLE movies (
+        id INTEGER NOT NULL PRIMARY KEY,
+        name VARCHAR(255) NOT NULL,
+        year INTEGER NOT NULL,
+        age_limit INTEGER NOT NULL,
+        rating INTEGER NOT NULL,
+        synopsis TEXT,
+        director_id INTEGER REFERENCES directors (id)
+    )""",
+    "CREATE INDEX ix_movies_id ON movies (id)",
+    "CREATE INDEX ix_movies_rating ON movies (rating)",
+    "CREATE INDEX ix_movies_name ON movies (name)",
+    "CREATE INDEX ix_movies_year ON movies (year)",
+    """CREATE TABLE movie_genre (
+        movie_id INTEGER NOT NULL REFERENCES movies (id),
+        genre_id INTEGER NOT NULL REFERENCES genres (id),
+        PRIMARY KEY (movie_id, genre_id)
+    )""",
+    """CREATE TABLE movie_actor (
+        movie_id INTEGER NOT NULL REFERENCES movies (id),
+        actor_id INTEGER NOT NULL REFERENCES actors (id),
+        PRIMARY KEY (movie_id, actor_id)
+    )""",
+]
+
+
+@pytest.fixture
+def legacy_conn():
+    """Connection to an in-memory database with the legacy schema."""
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    with engine.connect() as conn:
+        for ddl in LEGACY_SCHEMA:
+            conn.exec_driver_sql(ddl)
+        yield conn
+    engine.dispose()
+
+
+def test_people_upsert_without_unique_constraint(legacy_conn):
+    """Creating people must not use ON CONFLICT before the database is upgraded."""
+    from app.main import _get_or_create_actors, _get_or_create_director
+
+    db = Session(bind=legacy_conn)
+    [actor] = _get_or_create_actors(db, [PersonBase(first_name="Tom", last_name="Hanks")])
+    director = _get_or_create_director(db, PersonBase(first_name="Steven", last_name="Spielberg"))
+    assert actor.id is not None
+    assert director.id is not None
+
+
+def test_upgrade_merges_duplicate_people(legacy_conn):
+    """Test upgrading merges duplicate people, repoints their movie links and adds the constraints."""
+    from app.main import _get_or_create_actors
+
+    legacy_conn.execute(Director.__table__.insert(), [
+        {"id": 1, "first_name": "Steven", "last_name": "Spielberg"},
+        {"id": 2, "first_name": "Steven", "last_name": "Spielberg"},
+    ])
+    legacy_conn.execute(Actor.__table__.insert(), [
+        {"id": 1, "first_name": "Tom", "last_name": "Hanks"},
+        {"id": 2, "first_name": "Tom", "last_name": "Hanks"},
+        {"id": 3, "first_name": "Tom", "last_name": "Hanks"},
+        {"id": 4, "first_name": "Meryl", "last_name": "Streep"},
+    ])
+    legacy_conn.execute(Movie.__table__.insert(), [
+        {"id": 1, "name": "A", "year": 2000, "age_limit": 0, "rating": 3, "director_id": 2},
+        {"id": 2, "name": "B", "year": 2001, "age_limit": 0, "rating": 3, "director_id": 1},
+    ])
+    # Movie 1 lists two copies of Tom Hanks
+    legacy_conn.execute(movie_actor.insert(), [
+        {"movie_id": 1, "actor_id": 2},
+        {"movie_id": 1, "actor_id": 3},
+        {"movie_id": 1, "actor_id": 4},
+        {"movie_id": 2, "actor_id": 3},
+    ])
+
+    add_unique_person_names(legacy_conn)
+
+    assert legacy_conn.execute(select(Actor.id).order_by(Actor.id)).scalars().all() == [1, 4]
+    assert legacy_conn.execute(select(Director.id)).scalars().all() == [1]
+    assert legacy_conn.execute(select(Movie.director_id)).scalars().all() == [1, 1]
+    assert sorted(legacy_conn.execute(select(movie_actor)).all()) == [(1, 1), (1, 4), (2, 1)]
+    assert has_unique_key(legacy_conn, "actors", ["first_name", "last_name"])
+    assert has_unique_key(legacy_conn, "directors", ["first_name", "last_name"])
+
+    # Upserts now rely on the constraint, and running again is a no-op
+    db = Session(bind=legacy_conn)
+    [actor] = _get_or_create_actors(db, [PersonBase(first_name="Tom", last_name="Hanks")])
+    assert actor.id == 1
+    add_unique_person_names(legacy_conn)
+
+
+def test_people_upsert_uses_the_session_connection(tmp_path):
+    """Checking for the conflict target must not check out a second pooled connection."""
+    from app.main import _get_or_create_actors
+
+    engine = create_engine(f"sqlite:///{tmp_path / 'pool.db'}", pool_size=1, max_overflow=0, pool_timeout=1)
+    Base.metadata.create_all(engine)
+    with Session(engine) as db:
+        [actor] = _get_or_create_actors(db, [PersonBase(first_name="Tom", last_name="Hanks")])
+        assert actor.id is not None
+    engine.dispose()
+
+
+def test_upgrade_syncs_indexes(legacy_conn):
+    """Test upgrading creates the current model indexes and drops the superseded movie indexes."""
+    upgrade_schema(legacy_conn)
+
+    movie_indexes = {index["name"] for index in inspect(legacy_conn).get_indexes("movies")}
+    assert {"ix_movies_year_id", "ix_movies_rating_id", "ix_movies_name_id"} <= movie_indexes
+    assert not movie_indexes & {"ix_movies_name", "ix_movies_year", "ix_movies_rating"}
+    # PostgreSQL-only indexes are not created on SQLite
+    assert "movies_name_trgm" not in movie_indexes
+    assert has_unique_key(legacy_conn, "actors", ["first_name", "last_name"])
+
+    # Running again is a no-op
+    upgrade_schema(legacy_conn)
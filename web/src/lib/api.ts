@@ -17,6 +17,8 @@ export async function getMovies(filters: MovieFilters = {}): Promise<MoviesListR
   if (filters.order) params.set("order", filters.order);
   if (filters.limit !== undefined) params.set("limit", filters.limit.toString());
   if (filters.offset !== undefined) params.set("offset", filters.offset.toString());
+  if (filters.after_sort !== undefined) params.set("after_sort", filters.after_sort);
+  if (filters.after_id !== undefined) params.set("after_id", filters.after_id.toString());
 
   const url = `${API_BASE_URL}/api/movies${params.toString() ? `?${params}` : ""}`;
   const response = await fetch(url);
@@ -40,9 +40,15 @@ export interface Movie {
   director: Person | null;
 }
 
+export interface PageCursor {
+  after_sort: string;
+  after_id: number;
+}
+
 export interface MoviesListResponse {
   total: number;
   items: Movie[];
+  next_cursor: PageCursor | null;
 }
 
 export interface MovieFilters {
@@ -51,4 +57,6 @@ export interface MovieFilters {
   order?: "asc" | "desc";
   limit?: number;
   offset?: number;
+  after_sort?: string;
+  after_id?: number;
 }